@@ -0,0 +1,87 @@
+"""Fused scoring kernel for the CDP batch path.
+
+Computes churn risk, predicted LTV and the packed segment mask for a batch of
+customers in a single pass. Small batches use NumPy array expressions; large
+ones use a Numba-compiled loop when Numba is installed. Numba is imported and
+the loop compiled on the first large batch only.
+
+Segment rules are passed in as two parallel arrays in a fixed order (high
+value, at risk, dormant, new, active): `thresholds` holds each rule's
+threshold and `bits` the segment bit it sets.
+"""
+
+import numpy as np
+
+US_PER_DAY = 86_400_000_000
+
+# Below this size the NumPy path is faster than paying for Numba's import and JIT
+NUMBA_MIN_BATCH = 100_000
+
+# Replaced by numba.prange when the loop is compiled
+prange = range
+
+# Compiled loop once loaded, False if Numba is unavailable
+_numba_kernel = None
+
+
+def _score_all_loop(lv, la_us, has_la, ca_us, ev, now_us, thresholds, bits,
+                    out_churn, out_ltv, out_mask):
+    for i in prange(lv.shape[0]):
+        out_ltv[i] = lv[i] * (1.0 + ev[i] / 100.0) * 1.2
+        m = 0
+        if lv[i] > thresholds[0]:
+            m |= bits[0]
+        if (now_us - ca_us[i]) // US_PER_DAY < thresholds[3]:
+            m |= bits[3]
+        if has_la[i]:
+            inact = (now_us - la_us[i]) // US_PER_DAY
+            out_churn[i] = min(1.0, inact / 90.0)
+            if inact > thresholds[1]:
+                m |= bits[1]
+            if inact > thresholds[2]:
+                m |= bits[2]
+            if inact < thresholds[4]:
+                m |= bits[4]
+        else:
+            out_churn[i] = 0.0
+        out_mask[i] = m
+
+
+def _score_all_numpy(lv, la_us, has_la, ca_us, ev, now_us, thresholds, bits,
+                     out_churn, out_ltv, out_mask):
+    inact = np.where(has_la, now_us - np.where(has_la, la_us, now_us), 0) // US_PER_DAY
+    out_churn[:] = np.where(has_la, np.minimum(1.0, inact / 90.0), 0.0)
+    out_ltv[:] = lv * (1.0 + ev / 100.0) * 1.2
+    out_mask[:] = (
+        np.where(lv > thresholds[0], bits[0], 0)
+        | np.where(has_la & (inact > thresholds[1]), bits[1], 0)
+        | np.where(has_la & (inact > thresholds[2]), bits[2], 0)
+        | np.where((now_us - ca_us) // US_PER_DAY < thresholds[3], bits[3], 0)
+        | np.where(has_la & (inact < thresholds[4]), bits[4], 0)
+    )
+
+
+def _load_numba():
+    """Compile the loop with Numba on first use; None if Numba is missing."""
+    global _numba_kernel, prange
+    if _numba_kernel is None:
+        try:
+            import numba
+        except ImportError:
+            _numba_kernel = False
+        else:
+            prange = numba.prange
+            _numba_kernel = numba.njit(parallel=True, fastmath=True, cache=True)(_score_all_loop)
+    return _numba_kernel or None
+
+
+def score_all(lv, la_us, has_la, ca_us, ev, now_us, thresholds, bits,
+              out_churn, out_ltv, out_mask):
+    if lv.shape[0] >= NUMBA_MIN_BATCH:
+        kernel = _load_numba()
+        if kernel is not None:
+            kernel(lv, la_us, has_la, ca_us, ev, now_us, thresholds, bits,
+                   out_churn, out_ltv, out_mask)
+            return
+    _score_all_numpy(lv, la_us, has_la, ca_us, ev, now_us, thresholds, bits,
+                     out_churn, out_ltv, out_mask)
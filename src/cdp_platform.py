@@ -6,15 +6,39 @@ journey orchestration, GDPR/CCPA compliance.
 
 import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set, Mapping
+from collections import defaultdict
+from types import MappingProxyType
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
 import json
 import hashlib
+import operator
+import math
+import numbers
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from ._kernels import score_all
+except ImportError:
+    from _kernels import score_all
 
 logger = logging.getLogger(__name__)
 
+# Segmentation thresholds shared by the per-customer rules and the batch path
+HIGH_VALUE_LTV = 10000
+AT_RISK_DAYS = 30
+DORMANT_DAYS = 90
+ACTIVE_DAYS = 7
+NEW_DAYS = 30
+
 class CustomerSegment(Enum):
     HIGH_VALUE = "high_value"
     AT_RISK = "at_risk"
@@ -22,126 +46,609 @@ class CustomerSegment(Enum):
     DORMANT = "dormant"
     NEW = "new"
 
-@dataclass
+# Bits of the packed segment mask stored in Customer.segments, in rule evaluation order
+SEG_HIGH_VALUE = 1 << 0
+SEG_AT_RISK = 1 << 1
+SEG_DORMANT = 1 << 2
+SEG_NEW = 1 << 3
+SEG_ACTIVE = 1 << 4
+
+_SEGMENT_BITS = {
+    CustomerSegment.HIGH_VALUE: SEG_HIGH_VALUE,
+    CustomerSegment.AT_RISK: SEG_AT_RISK,
+    CustomerSegment.DORMANT: SEG_DORMANT,
+    CustomerSegment.NEW: SEG_NEW,
+    CustomerSegment.ACTIVE: SEG_ACTIVE
+}
+# Segment order of the rule parameters score_all expects
+_KERNEL_SEGMENTS = (
+    CustomerSegment.HIGH_VALUE,
+    CustomerSegment.AT_RISK,
+    CustomerSegment.DORMANT,
+    CustomerSegment.NEW,
+    CustomerSegment.ACTIVE
+)
+_KERNEL_BITS = np.array([_SEGMENT_BITS[s] for s in _KERNEL_SEGMENTS], dtype=np.uint8)
+# Segment values decoded from every possible mask
+_SEGMENT_NAMES = [
+    tuple(s.value for s, bit in _SEGMENT_BITS.items() if mask & bit)
+    for mask in range(1 << len(_SEGMENT_BITS))
+]
+
+_RULE_OPS = {'>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le}
+
+@dataclass(frozen=True)
+class SegmentRule:
+    """Threshold test on one customer metric, e.g. SegmentRule('days_inactive', '>', 30).
+    
+    Metrics are 'lifetime_value', 'days_inactive' (whole days since last_activity;
+    never matches customers without activity) and 'days_since_created'.
+    """
+    metric: str
+    op: str
+    threshold: float
+    
+    def __post_init__(self):
+        if self.metric not in ('lifetime_value', 'days_inactive', 'days_since_created'):
+            raise ValueError(f"Unknown segment rule metric: {self.metric!r}")
+        if self.op not in _RULE_OPS:
+            raise ValueError(f"Unknown segment rule operator: {self.op!r}")
+        if (isinstance(self.threshold, bool) or not isinstance(self.threshold, numbers.Real)
+                or not math.isfinite(self.threshold)):
+            raise ValueError(f"Segment rule threshold must be a finite number, got {self.threshold!r}")
+        # Plain int/float so compile_rules can inline its repr (np.float64(14.0) would not evaluate)
+        plain = int(self.threshold) if isinstance(self.threshold, numbers.Integral) else float(self.threshold)
+        object.__setattr__(self, 'threshold', plain)
+
+DEFAULT_SEGMENT_RULES = {
+    CustomerSegment.HIGH_VALUE: SegmentRule('lifetime_value', '>', HIGH_VALUE_LTV),
+    CustomerSegment.AT_RISK: SegmentRule('days_inactive', '>', AT_RISK_DAYS),
+    CustomerSegment.DORMANT: SegmentRule('days_inactive', '>', DORMANT_DAYS),
+    CustomerSegment.NEW: SegmentRule('days_since_created', '<', NEW_DAYS),
+    CustomerSegment.ACTIVE: SegmentRule('days_inactive', '<', ACTIVE_DAYS)
+}
+
+@dataclass(slots=True)
 class Customer:
     id: str
     email: str
     name: str
     attributes: Dict[str, Any] = field(default_factory=dict)
-    events: List[Dict[str, Any]] = field(default_factory=list)
-    segments: List[CustomerSegment] = field(default_factory=list)
+    segments: int = 0
     lifetime_value: float = 0.0
     last_activity: Optional[datetime] = None
     created_at: datetime = field(default_factory=datetime.now)
+    
+    def to_view(self, total_events: int = 0) -> Dict[str, Any]:
+        """360° view of this customer as a plain dict."""
+        return {
+            'id': self.id,
+            'email': self.email,
+            'name': self.name,
+            'lifetime_value': self.lifetime_value,
+            'segments': _SEGMENT_NAMES[self.segments],
+            'total_events': total_events,
+            'last_activity': self.last_activity,
+            'attributes': self.attributes
+        }
 
-class UnifiedProfileEngine:
+class IdInterner:
+    """Assigns dense integer ids to string ids in first-seen order."""
+    
     def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._keys: List[str] = []
+        
+    def __len__(self) -> int:
+        return len(self._keys)
+        
+    def intern(self, key: str) -> int:
+        idx = self._ids.get(key)
+        if idx is None:
+            idx = self._ids[key] = len(self._keys)
+            self._keys.append(key)
+        return idx
+        
+    def get(self, key: str) -> Optional[int]:
+        return self._ids.get(key)
+        
+    def resolve(self, key: str) -> int:
+        return self._ids[key]
+        
+    def lookup(self, idx: int) -> str:
+        return self._keys[idx]
+
+class EventStore:
+    """Columnar, append-only event log keyed by interned customer id.
+    
+    Events are stored as parallel arrays (timestamp, uint16 event type id,
+    float32 value, owner). Rows [0, _sorted) are in CSR order (grouped by owner,
+    each customer's events contiguous and in append order); newer rows sit in an
+    unsorted tail. Queries binary-search the sorted part and scan the tail; the
+    tail is merged into the sorted part once it grows past a fraction of the log,
+    so appends never trigger a full re-sort.
+    """
+    
+    _COLUMNS = ('ts', 'etype', 'value', 'owner')
+    MAX_EVENT_TYPES = np.iinfo(np.uint16).max + 1
+    
+    def __init__(self, capacity: int = 1024):
+        self.event_types = IdInterner()
+        self.ts = np.empty(capacity, dtype='datetime64[us]')
+        self.etype = np.empty(capacity, dtype=np.uint16)
+        self.value = np.empty(capacity, dtype=np.float32)
+        self.owner = np.empty(capacity, dtype=np.int64)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self._size = 0
+        self._sorted = 0
+        
+    def __len__(self) -> int:
+        return self._size
+        
+    def append(self, idx: int, timestamp: datetime, event_type: str, value: float = 0.0):
+        etype = self.event_types.get(event_type)
+        if etype is None:
+            if len(self.event_types) >= self.MAX_EVENT_TYPES:
+                raise ValueError(f"EventStore supports at most {self.MAX_EVENT_TYPES} distinct event types")
+            etype = self.event_types.intern(event_type)
+        if self._size == len(self.ts):
+            capacity = max(1024, 2 * self._size)
+            for name in self._COLUMNS:
+                column = getattr(self, name)
+                grown = np.empty(capacity, dtype=column.dtype)
+                grown[:self._size] = column[:self._size]
+                setattr(self, name, grown)
+        if idx >= len(self.counts):
+            counts = np.zeros(max(16, 2 * len(self.counts), idx + 1), dtype=np.int64)
+            counts[:len(self.counts)] = self.counts
+            self.counts = counts
+        i = self._size
+        self.ts[i] = timestamp
+        self.etype[i] = etype
+        self.value[i] = value
+        self.owner[i] = idx
+        self.counts[idx] += 1
+        self._size += 1
+        if self._size - self._sorted > max(1024, self._sorted // 8):
+            self._merge_tail()
+        
+    def count(self, idx: int) -> int:
+        return int(self.counts[idx]) if idx < len(self.counts) else 0
+        
+    def count_many(self, idxs: np.ndarray) -> np.ndarray:
+        """Vectorized count() for an array of customer ids."""
+        out = np.zeros(len(idxs), dtype=np.int64)
+        known = idxs < len(self.counts)
+        out[known] = self.counts[idxs[known]]
+        return out
+        
+    def window(self, idx: int, start: Optional[datetime] = None,
+               end: Optional[datetime] = None) -> Dict[str, np.ndarray]:
+        """Events for one customer with start <= timestamp < end, in append order."""
+        owner = self.owner[:self._sorted]
+        lo = np.searchsorted(owner, idx, side='left')
+        hi = np.searchsorted(owner, idx, side='right')
+        tail = np.flatnonzero(self.owner[self._sorted:self._size] == idx) + self._sorted
+        rows = np.concatenate((np.arange(lo, hi), tail))
+        ts = self.ts[rows]
+        keep = np.ones(len(rows), dtype=bool)
+        if start is not None:
+            keep &= ts >= np.datetime64(start, 'us')
+        if end is not None:
+            keep &= ts < np.datetime64(end, 'us')
+        rows = rows[keep]
+        return {
+            'timestamp': ts[keep],
+            'event_type': self.etype[rows],
+            'value': self.value[rows]
+        }
+        
+    def remove(self, idx: int):
+        """Drop every event owned by a customer."""
+        if self.count(idx) == 0:
+            return
+        keep = np.flatnonzero(self.owner[:self._size] != idx)
+        # Filtering preserves order, so the sorted prefix stays sorted
+        self._sorted = int(np.searchsorted(keep, self._sorted))
+        for name in self._COLUMNS:
+            column = getattr(self, name)
+            column[:len(keep)] = column[keep]
+        self._size = len(keep)
+        self.counts[idx] = 0
+        
+    def _merge_tail(self):
+        """Merge the unsorted tail into the sorted prefix without re-sorting it."""
+        n_sorted, size = self._sorted, self._size
+        tail_order = np.argsort(self.owner[n_sorted:size], kind='stable') + n_sorted
+        # Each tail row goes after the sorted rows of the same owner
+        insert_at = np.searchsorted(self.owner[:n_sorted], self.owner[tail_order], side='right')
+        tail_dest = insert_at + np.arange(len(tail_order))
+        sorted_dest = np.arange(n_sorted) + np.searchsorted(insert_at, np.arange(n_sorted), side='right')
+        for name in self._COLUMNS:
+            column = getattr(self, name)
+            merged = np.empty(size, dtype=column.dtype)
+            merged[sorted_dest] = column[:n_sorted]
+            merged[tail_dest] = column[tail_order]
+            column[:size] = merged
+        self._sorted = size
+
+def _normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class UnifiedProfileEngine:
+    def __init__(self, ids: Optional[IdInterner] = None, events: Optional[EventStore] = None):
+        self.ids = ids if ids is not None else IdInterner()
+        self.events = events if events is not None else EventStore()
         self.profiles: Dict[str, Customer] = {}
-        self.identity_graph: Dict[str, Set[str]] = {}
+        # Identity resolution as a disjoint-set forest over interned identifiers
+        self._identities = IdInterner()
+        self._parent: List[int] = []
+        self._rank: List[int] = []
+        # Circular linked list through each identity's members, for members()
+        self._next: List[int] = []
         
     def merge_identities(self, email: str, user_id: str, device_id: str):
-        key = hashlib.md5(email.encode()).hexdigest()
-        if key not in self.identity_graph:
-            self.identity_graph[key] = set()
-        self.identity_graph[key].update([email, user_id, device_id])
+        a = self._identity(_normalize_email(email))
+        b = self._identity(user_id)
+        c = self._identity(device_id)
+        self._union(a, b)
+        self._union(b, c)
+        
+    def same_identity(self, first: str, second: str) -> bool:
+        """Whether two identifiers were merged into one identity."""
+        a = self._lookup_identity(first)
+        b = self._lookup_identity(second)
+        if a is None or b is None:
+            return False
+        return self._find(a) == self._find(b)
+        
+    def members(self, identifier: str) -> Set[str]:
+        """All identifiers merged with this one (emails in normalized form)."""
+        start = self._lookup_identity(identifier)
+        if start is None:
+            return set()
+        found = {self._identities.lookup(start)}
+        i = self._next[start]
+        while i != start:
+            found.add(self._identities.lookup(i))
+            i = self._next[i]
+        return found
+        
+    def _lookup_identity(self, identifier: str) -> Optional[int]:
+        # Exact match first (user and device ids), then as a normalized email
+        idx = self._identities.get(identifier)
+        if idx is None and '@' in identifier:
+            idx = self._identities.get(_normalize_email(identifier))
+        return idx
+        
+    def _identity(self, key: str) -> int:
+        idx = self._identities.intern(key)
+        if idx == len(self._parent):
+            self._parent.append(idx)
+            self._rank.append(0)
+            self._next.append(idx)
+        return idx
+        
+    def _find(self, i: int) -> int:
+        parent = self._parent
+        while parent[i] != i:
+            # Path halving
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+        
+    def _union(self, a: int, b: int):
+        a, b = self._find(a), self._find(b)
+        if a == b:
+            return
+        if self._rank[a] < self._rank[b]:
+            a, b = b, a
+        self._parent[b] = a
+        if self._rank[a] == self._rank[b]:
+            self._rank[a] += 1
+        # Splice the two member cycles together
+        self._next[a], self._next[b] = self._next[b], self._next[a]
         
     def create_profile(self, customer: Customer) -> str:
+        self.ids.intern(customer.id)
         self.profiles[customer.id] = customer
-        logger.info(f"Created profile for {customer.email}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Created profile for {customer.email}")
         return customer.id
         
+    def create_profiles(self, customers: List[Customer]):
+        """Bulk create_profile for a batch of customers."""
+        intern = self.ids.intern
+        for customer in customers:
+            intern(customer.id)
+            self.profiles[customer.id] = customer
+        logger.debug(f"Created {len(customers)} profiles")
+        
+    def track_event(self, customer_id: str, event_type: str, value: float = 0.0,
+                    timestamp: Optional[datetime] = None):
+        timestamp = timestamp or datetime.now()
+        self.events.append(self.ids.intern(customer_id), timestamp, event_type, value)
+        customer = self.profiles.get(customer_id)
+        if customer is not None and (customer.last_activity is None or timestamp > customer.last_activity):
+            customer.last_activity = timestamp
+        
+    def resolve(self, customer_id: str) -> int:
+        """Dense integer id shared by the other CDP components."""
+        return self.ids.resolve(customer_id)
+        
     def get_360_view(self, customer_id: str) -> Dict[str, Any]:
-        if customer_id not in self.profiles:
+        customer = self.profiles.get(customer_id)
+        if customer is None:
             return {}
-        customer = self.profiles[customer_id]
-        return {
-            'id': customer.id,
-            'email': customer.email,
-            'name': customer.name,
-            'lifetime_value': customer.lifetime_value,
-            'segments': [s.value for s in customer.segments],
-            'total_events': len(customer.events),
-            'last_activity': customer.last_activity,
-            'attributes': customer.attributes
-        }
+        return customer.to_view(self.events.count(self.ids.intern(customer_id)))
+        
+    def get_360_view_bytes(self, customer_id: str) -> bytes:
+        """360° view serialized as UTF-8 JSON, via orjson when installed."""
+        view = self.get_360_view(customer_id)
+        if orjson is not None:
+            return orjson.dumps(view, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(view, separators=(',', ':'), ensure_ascii=False, default=_json_default).encode()
 
 class RealtimeSegmentation:
-    def __init__(self):
-        self.segments: Dict[CustomerSegment, List[str]] = {s: [] for s in CustomerSegment}
-        self.rules = {
-            CustomerSegment.HIGH_VALUE: lambda c: c.lifetime_value > 10000,
-            CustomerSegment.AT_RISK: lambda c: c.last_activity and (datetime.now() - c.last_activity).days > 30,
-            CustomerSegment.DORMANT: lambda c: c.last_activity and (datetime.now() - c.last_activity).days > 90,
-            CustomerSegment.NEW: lambda c: (datetime.now() - c.created_at).days < 30,
-            CustomerSegment.ACTIVE: lambda c: c.last_activity and (datetime.now() - c.last_activity).days < 7
+    def __init__(self, ids: Optional[IdInterner] = None):
+        self.ids = ids if ids is not None else IdInterner()
+        self.segments: Dict[CustomerSegment, Set[int]] = {s: set() for s in CustomerSegment}
+        self._rules: Dict[CustomerSegment, SegmentRule] = dict(DEFAULT_SEGMENT_RULES)
+        self.compile_rules()
+        
+    @property
+    def rules(self) -> Mapping[CustomerSegment, SegmentRule]:
+        """Read-only view of the active rules; change them with define_rule()."""
+        return MappingProxyType(self._rules)
+        
+    def compile_rules(self):
+        """Generate one specialized function evaluating every rule into a segment mask.
+        
+        Thresholds and segment bits are inlined as literals. Also works out whether
+        the rules still fit the fused scoring kernel (see kernel_thresholds).
+        """
+        used = {rule.metric for rule in self._rules.values()}
+        lines = ["def _eval(c, now):", "    mask = 0"]
+        if 'days_inactive' in used:
+            lines.append("    la = c.last_activity")
+            lines.append("    days_inactive = (now - la).days if la is not None else None")
+        if 'days_since_created' in used:
+            lines.append("    days_since_created = (now - c.created_at).days")
+        for segment, rule in self._rules.items():
+            if rule.metric == 'lifetime_value':
+                test = f"c.lifetime_value {rule.op} {rule.threshold!r}"
+            elif rule.metric == 'days_inactive':
+                test = f"days_inactive is not None and days_inactive {rule.op} {rule.threshold!r}"
+            else:
+                test = f"days_since_created {rule.op} {rule.threshold!r}"
+            lines.append(f"    if {test}: mask |= {_SEGMENT_BITS[segment]}")
+        lines.append("    return mask")
+        # Source is built only from validated metrics, operators and numbers
+        namespace: Dict[str, Any] = {}
+        exec(compile("\n".join(lines), "<segment-rules>", "exec"), {'__builtins__': {}}, namespace)
+        self._eval = namespace['_eval']
+        
+        # The fused kernel hardcodes each segment's metric and operator; only thresholds vary
+        fits_kernel = self._rules.keys() == DEFAULT_SEGMENT_RULES.keys() and all(
+            (rule.metric, rule.op) == (DEFAULT_SEGMENT_RULES[s].metric, DEFAULT_SEGMENT_RULES[s].op)
+            for s, rule in self._rules.items()
+        )
+        self.kernel_thresholds: Optional[np.ndarray] = (
+            np.array([self._rules[s].threshold for s in _KERNEL_SEGMENTS], dtype=np.float64)
+            if fits_kernel else None
+        )
+        
+    def define_rule(self, segment: CustomerSegment, rule: SegmentRule):
+        if not isinstance(rule, SegmentRule):
+            raise TypeError(f"Segment rules must be SegmentRule instances, got {type(rule).__name__}")
+        self._rules[segment] = rule
+        self.compile_rules()
+        
+    def segment_customer(self, customer: Customer, now: Optional[datetime] = None):
+        idx = self.ids.intern(customer.id)
+        mask = self._eval(customer, now or datetime.now())
+        for segment, bit in _SEGMENT_BITS.items():
+            if mask & bit:
+                self.segments[segment].add(idx)
+        customer.segments = mask
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Customer {customer.id} segmented: {_SEGMENT_NAMES[mask]}")
+
+    def segment_batch(self, customers: List[Customer], now: Optional[datetime] = None) -> np.ndarray:
+        """Segment many customers at once using vectorized rule masks.
+        
+        Returns the packed uint8 segment mask per customer (see SEG_*).
+        """
+        if not customers:
+            return np.zeros(0, dtype=np.uint8)
+        one_day = np.timedelta64(1, 'D')
+        lv = np.fromiter((c.lifetime_value for c in customers), dtype=np.float64, count=len(customers))
+        la = np.array([c.last_activity or np.datetime64('NaT') for c in customers], dtype='datetime64[us]')
+        ca = np.array([c.created_at for c in customers], dtype='datetime64[us]')
+        # Naive local timestamps, so take "now" from datetime rather than np.datetime64('now') (UTC)
+        now = np.datetime64(now or datetime.now(), 'us')
+        
+        # Floor division matches timedelta.days; customers without activity match no activity rule
+        has_activity = ~np.isnat(la)
+        days_inactive = np.where(has_activity, (now - np.where(has_activity, la, now)) // one_day, 0)
+        days_since_created = (now - ca) // one_day
+        metrics = {
+            'lifetime_value': lv,
+            'days_inactive': days_inactive,
+            'days_since_created': days_since_created
         }
+        mask = np.zeros(len(customers), dtype=np.uint8)
+        for segment, rule in self._rules.items():
+            hit = _RULE_OPS[rule.op](metrics[rule.metric], rule.threshold)
+            if rule.metric == 'days_inactive':
+                hit &= has_activity
+            mask[hit] |= _SEGMENT_BITS[segment]
+        self.apply_mask(customers, mask)
+        return mask
         
-    async def segment_customer(self, customer: Customer):
-        customer.segments = []
-        for segment, rule in self.rules.items():
-            if rule(customer):
-                customer.segments.append(segment)
-                if customer.id not in self.segments[segment]:
-                    self.segments[segment].append(customer.id)
-        logger.debug(f"Customer {customer.id} segmented: {[s.value for s in customer.segments]}")
+    def apply_mask(self, customers: List[Customer], mask: np.ndarray):
+        """Record packed segment masks computed for customers."""
+        rows = np.fromiter((self.ids.intern(c.id) for c in customers), dtype=np.int64, count=len(customers))
+        self.apply_mask_rows(customers, rows, mask)
+        
+    def apply_mask_rows(self, customers: List[Customer], rows: np.ndarray, mask: np.ndarray):
+        """Like apply_mask, for callers that already interned the customer ids."""
+        for segment, bit in _SEGMENT_BITS.items():
+            self.segments[segment].update(rows[np.flatnonzero(mask & bit)].tolist())
+        for customer, m in zip(customers, mask.tolist()):
+            customer.segments = m
+        logger.debug(f"Segmented batch of {len(customers)} customers")
 
 class PredictiveAnalytics:
-    def __init__(self):
-        self.predictions: Dict[str, Dict[str, float]] = {}
+    # One row per customer; NaN marks a prediction that has not been made yet
+    _DTYPE = np.dtype([('churn', np.float32), ('ltv', np.float32)])
+    
+    def __init__(self, ids: Optional[IdInterner] = None, events: Optional[EventStore] = None):
+        self.ids = ids if ids is not None else IdInterner()
+        self.events = events if events is not None else EventStore()
+        self._arr = np.full(0, np.nan, dtype=self._DTYPE)
+        
+    @property
+    def predictions(self) -> Dict[str, Dict[str, float]]:
+        """Dict view of the prediction table, built on each access."""
+        view = {}
+        for idx, (churn, ltv) in enumerate(self._arr[:len(self.ids)].tolist()):
+            entry = {}
+            if churn == churn:
+                entry['churn_risk'] = churn
+            if ltv == ltv:
+                entry['predicted_ltv'] = ltv
+            if entry:
+                view[self.ids.lookup(idx)] = entry
+        return view
+        
+    def _ensure(self, customer_id: str) -> int:
+        idx = self.ids.intern(customer_id)
+        self._grow(idx + 1)
+        return idx
         
-    async def predict_churn(self, customer: Customer) -> float:
+    def _grow(self, size: int):
+        if size > len(self._arr):
+            grown = np.full(max(16, 2 * len(self._arr), size), np.nan, dtype=self._DTYPE)
+            grown[:len(self._arr)] = self._arr
+            self._arr = grown
+        
+    def _rows(self, customers: List[Customer]) -> np.ndarray:
+        rows = np.fromiter((self.ids.intern(c.id) for c in customers), dtype=np.intp, count=len(customers))
+        if len(rows):
+            self._grow(int(rows.max()) + 1)
+        return rows
+        
+    def predict_churn(self, customer: Customer, now: Optional[datetime] = None) -> float:
         score = 0.0
         if customer.last_activity:
-            days_inactive = (datetime.now() - customer.last_activity).days
+            days_inactive = ((now or datetime.now()) - customer.last_activity).days
             score = min(1.0, days_inactive / 90.0)
-        self.predictions[customer.id] = {'churn_risk': score}
+        idx = self._ensure(customer.id)
+        self._arr['churn'][idx] = score
         return score
         
-    async def predict_ltv(self, customer: Customer) -> float:
+    def predict_ltv(self, customer: Customer) -> float:
+        idx = self._ensure(customer.id)
         base_value = customer.lifetime_value
-        activity_multiplier = 1.0 + (len(customer.events) / 100.0)
+        activity_multiplier = 1.0 + (self.events.count(idx) / 100.0)
         predicted_ltv = base_value * activity_multiplier * 1.2
-        if customer.id not in self.predictions:
-            self.predictions[customer.id] = {}
-        self.predictions[customer.id]['predicted_ltv'] = predicted_ltv
+        self._arr['ltv'][idx] = predicted_ltv
         return predicted_ltv
+        
+    def predict_churn_batch(self, customers: List[Customer], now: Optional[datetime] = None) -> np.ndarray:
+        """Vectorized predict_churn over many customers."""
+        la = np.array([c.last_activity or np.datetime64('NaT') for c in customers], dtype='datetime64[us]')
+        now = np.datetime64(now or datetime.now(), 'us')
+        has_activity = ~np.isnat(la)
+        days_inactive = (now - np.where(has_activity, la, now)) // np.timedelta64(1, 'D')
+        scores = np.where(has_activity, np.minimum(1.0, days_inactive / 90.0), 0.0)
+        rows = self._rows(customers)
+        self._arr['churn'][rows] = scores
+        return scores
+        
+    def predict_ltv_batch(self, customers: List[Customer]) -> np.ndarray:
+        """Vectorized predict_ltv over many customers."""
+        rows = self._rows(customers)
+        lv = np.fromiter((c.lifetime_value for c in customers), dtype=np.float64, count=len(customers))
+        predicted = lv * (1.0 + self.events.count_many(rows) / 100.0) * 1.2
+        self._arr['ltv'][rows] = predicted
+        return predicted
+        
+    def record_batch(self, customers: List[Customer], churn: np.ndarray, ltv: np.ndarray):
+        """Store churn and LTV scores computed elsewhere for customers."""
+        self.record_rows(self._rows(customers), churn, ltv)
+        
+    def record_rows(self, rows: np.ndarray, churn: np.ndarray, ltv: np.ndarray):
+        """Like record_batch, keyed by already-interned customer rows."""
+        if len(rows):
+            self._grow(int(rows.max()) + 1)
+        self._arr['churn'][rows] = churn
+        self._arr['ltv'][rows] = ltv
 
 class JourneyOrchestrator:
-    def __init__(self):
+    def __init__(self, ids: Optional[IdInterner] = None):
+        self.ids = ids if ids is not None else IdInterner()
         self.journeys: Dict[str, List[Dict[str, Any]]] = {}
-        self.active_journeys: Dict[str, str] = {}
+        self.active_journeys: Dict[int, str] = {}
         
     def define_journey(self, name: str, stages: List[Dict[str, Any]]):
         self.journeys[name] = stages
         logger.info(f"Defined journey: {name} with {len(stages)} stages")
         
-    async def enroll_customer(self, customer_id: str, journey_name: str):
+    def enroll_customer(self, customer_id: str, journey_name: str):
         if journey_name in self.journeys:
-            self.active_journeys[customer_id] = journey_name
+            self.active_journeys[self.ids.intern(customer_id)] = journey_name
             logger.info(f"Enrolled customer {customer_id} in {journey_name}")
             
-    async def advance_journey(self, customer_id: str, stage: int):
-        if customer_id in self.active_journeys:
-            journey = self.active_journeys[customer_id]
+    def advance_journey(self, customer_id: str, stage: int):
+        journey = self.active_journeys.get(self.ids.get(customer_id))
+        if journey is not None:
             logger.debug(f"Customer {customer_id} advanced to stage {stage} in {journey}")
 
 class PrivacyCompliance:
-    def __init__(self):
-        self.consent_records: Dict[str, Dict[str, Any]] = {}
+    def __init__(self, ids: Optional[IdInterner] = None, events: Optional[EventStore] = None,
+                 pseudonym_key: Optional[bytes] = None):
+        self.ids = ids if ids is not None else IdInterner()
+        self.events = events if events is not None else EventStore()
+        if pseudonym_key is not None and not 16 <= len(pseudonym_key) <= 64:
+            raise ValueError("pseudonym_key must be 16 to 64 bytes")
+        self._pseudonym_key = pseudonym_key
+        self.consent_records: Dict[int, Dict[str, Any]] = defaultdict(dict)
         self.deletion_requests: List[Dict[str, Any]] = []
         
-    async def record_consent(self, customer_id: str, purpose: str, granted: bool):
-        if customer_id not in self.consent_records:
-            self.consent_records[customer_id] = {}
-        self.consent_records[customer_id][purpose] = {
+    def record_consent(self, customer_id: str, purpose: str, granted: bool):
+        self.consent_records[self.ids.intern(customer_id)][purpose] = {
             'granted': granted,
             'timestamp': datetime.now()
         }
         logger.info(f"Consent recorded for {customer_id}: {purpose} = {granted}")
         
-    async def process_deletion_request(self, customer_id: str, profiles: Dict[str, Customer]):
+    def pseudonymize(self, identifier: str) -> bytes:
+        """Stable 16-byte pseudonymous key for an email or other identifier.
+        
+        Keyed BLAKE2b, so pseudonyms cannot be reversed by hashing candidate
+        emails without the secret, and match across deployments sharing the key.
+        """
+        if self._pseudonym_key is None:
+            raise RuntimeError("pseudonymize() requires a pseudonym_key")
+        # Emails are case-insensitive; user and device ids are not (as in _lookup_identity)
+        if '@' in identifier:
+            identifier = _normalize_email(identifier)
+        data = identifier.encode()
+        return hashlib.blake2b(data, key=self._pseudonym_key, digest_size=16).digest()
+        
+    def process_deletion_request(self, customer_id: str, profiles: Dict[str, Customer]):
         if customer_id in profiles:
             del profiles[customer_id]
+            self.events.remove(self.ids.intern(customer_id))
             self.deletion_requests.append({
                 'customer_id': customer_id,
                 'processed_at': datetime.now()
@@ -149,12 +656,54 @@ class PrivacyCompliance:
             logger.info(f"Deleted data for customer {customer_id}")
 
 class IntelligentCDP:
-    def __init__(self):
-        self.profile_engine = UnifiedProfileEngine()
-        self.segmentation = RealtimeSegmentation()
-        self.predictive = PredictiveAnalytics()
-        self.journey = JourneyOrchestrator()
-        self.privacy = PrivacyCompliance()
+    def __init__(self, pseudonym_key: Optional[bytes] = None):
+        # Components share one interner so customer ids map to the same int everywhere
+        self.ids = IdInterner()
+        self.events = EventStore()
+        self.profile_engine = UnifiedProfileEngine(self.ids, self.events)
+        self.segmentation = RealtimeSegmentation(self.ids)
+        self.predictive = PredictiveAnalytics(self.ids, self.events)
+        self.journey = JourneyOrchestrator(self.ids)
+        self.privacy = PrivacyCompliance(self.ids, self.events, pseudonym_key)
+        
+    def ingest_batch(self, customers: List[Customer], now: Optional[datetime] = None) -> np.ndarray:
+        """Create profiles for customers and score them in one pass.
+        
+        Returns the packed segment mask per customer.
+        """
+        self.profile_engine.create_profiles(customers)
+        return self.score_batch(customers, now)
+        
+    def score_batch(self, customers: List[Customer], now: Optional[datetime] = None) -> np.ndarray:
+        """Segment and predict for customers with one fused kernel pass.
+        
+        Falls back to segment_batch plus the batched predictions when custom rules
+        no longer fit the kernel. Returns the packed segment mask per customer.
+        """
+        thresholds = self.segmentation.kernel_thresholds
+        if thresholds is None:
+            mask = self.segmentation.segment_batch(customers, now)
+            self.predictive.predict_churn_batch(customers, now)
+            self.predictive.predict_ltv_batch(customers)
+            return mask
+        
+        n = len(customers)
+        lv = np.fromiter((c.lifetime_value for c in customers), dtype=np.float64, count=n)
+        la = np.array([c.last_activity or np.datetime64('NaT') for c in customers], dtype='datetime64[us]')
+        ca = np.array([c.created_at for c in customers], dtype='datetime64[us]')
+        rows = np.fromiter((self.ids.intern(c.id) for c in customers), dtype=np.int64, count=n)
+        ev = self.events.count_many(rows)
+        now_us = np.datetime64(now or datetime.now(), 'us').astype(np.int64)
+        
+        churn = np.empty(n, dtype=np.float64)
+        ltv = np.empty(n, dtype=np.float64)
+        mask = np.empty(n, dtype=np.uint8)
+        score_all(lv, la.view(np.int64), ~np.isnat(la), ca.view(np.int64), ev, now_us,
+                  thresholds, _KERNEL_BITS, churn, ltv, mask)
+        
+        self.segmentation.apply_mask_rows(customers, rows, mask)
+        self.predictive.record_rows(rows, churn, ltv)
+        return mask
         
     async def demo(self):
         logger.info("\n" + "="*60)
@@ -162,18 +711,18 @@ class IntelligentCDP:
         logger.info("="*60)
         
         # Create customers
-        for i in range(100):
-            customer = Customer(
+        customers = [
+            Customer(
                 id=f"cust-{i}",
                 email=f"customer{i}@example.com",
                 name=f"Customer {i}",
                 lifetime_value=1000 + i * 100,
                 last_activity=datetime.now() - timedelta(days=i % 60)
             )
-            self.profile_engine.create_profile(customer)
-            await self.segmentation.segment_customer(customer)
-            await self.predictive.predict_churn(customer)
-            await self.predictive.predict_ltv(customer)
+            for i in range(100)
+        ]
+        self.ingest_batch(customers)
+        logger.info(f"Created {len(customers)} profiles")
             
         # Journey orchestration
         self.journey.define_journey("onboarding", [
@@ -183,7 +732,7 @@ class IntelligentCDP:
         ])
         
         # Privacy compliance
-        await self.privacy.record_consent("cust-0", "marketing", True)
+        self.privacy.record_consent("cust-0", "marketing", True)
         
         logger.info(f"\nCustomers: {len(self.profile_engine.profiles)}")
         logger.info(f"Segments:")
@@ -0,0 +1,66 @@
+"""EventStore queries must match a plain list of appended events."""
+
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.cdp_platform import EventStore
+
+T0 = datetime(2026, 1, 1)
+
+
+def _model_window(model, idx, start=None, end=None):
+    return [(ts, etype, value) for owner, ts, etype, value in model
+            if owner == idx and (start is None or ts >= start) and (end is None or ts < end)]
+
+
+def _check(store, model, owners, rng):
+    owner = store.owner[:store._sorted]
+    assert np.all(owner[:-1] <= owner[1:])
+    idxs = np.array(owners + [max(owners) + 100], dtype=np.int64)
+    expected = [sum(1 for o, *_ in model if o == idx) for idx in idxs.tolist()]
+    assert store.count_many(idxs).tolist() == expected
+    assert [store.count(idx) for idx in idxs.tolist()] == expected
+    for idx in owners:
+        start = rng.choice([None, T0 + timedelta(seconds=rng.randrange(6000))])
+        end = rng.choice([None, T0 + timedelta(seconds=rng.randrange(6000))])
+        got = store.window(idx, start, end)
+        events = list(zip(got['timestamp'].astype(datetime).tolist(),
+                          [store.event_types.lookup(e) for e in got['event_type'].tolist()],
+                          got['value'].tolist()))
+        assert events == _model_window(model, idx, start, end)
+
+
+def test_interleaved_appends_and_removes_match_list_model():
+    rng = random.Random(7)
+    store = EventStore(capacity=16)
+    model = []
+    owners = list(range(20))
+    for step in range(6000):
+        idx = rng.choice(owners)
+        ts = T0 + timedelta(seconds=rng.randrange(6000))
+        etype = rng.choice(['view', 'click', 'purchase'])
+        store.append(idx, ts, etype, float(step % 50))
+        model.append((idx, ts, etype, float(step % 50)))
+        if step % 700 == 699:
+            victim = rng.choice(owners)
+            store.remove(victim)
+            model = [event for event in model if event[0] != victim]
+        if step % 500 == 499:
+            _check(store, model, owners, rng)
+    assert store._sorted > 0
+    assert len(store) == len(model)
+    _check(store, model, owners, rng)
+
+
+def test_too_many_event_types_raises_value_error():
+    store = EventStore()
+    for i in range(EventStore.MAX_EVENT_TYPES):
+        store.event_types.intern(f"type-{i}")
+    store.append(0, T0, "type-0")
+    with pytest.raises(ValueError):
+        store.append(0, T0, "one-too-many")
+    assert len(store) == 1
+    assert store.event_types.get("one-too-many") is None
@@ -0,0 +1,48 @@
+"""Identity resolution through UnifiedProfileEngine's union-find."""
+
+from src.cdp_platform import UnifiedProfileEngine
+
+
+def test_shared_device_merges_identities_transitively():
+    engine = UnifiedProfileEngine()
+    engine.merge_identities("alice@example.com", "u-alice", "device-1")
+    engine.merge_identities("alice.work@example.com", "u-alice-work", "device-1")
+    engine.merge_identities("bob@example.com", "u-bob", "device-2")
+    assert engine.same_identity("alice@example.com", "u-alice-work")
+    assert engine.same_identity("u-alice", "alice.work@example.com")
+    assert not engine.same_identity("alice@example.com", "bob@example.com")
+    assert engine.members("device-1") == {
+        "alice@example.com", "u-alice", "device-1",
+        "alice.work@example.com", "u-alice-work",
+    }
+    assert engine.members("u-bob") == {"bob@example.com", "u-bob", "device-2"}
+
+
+def test_remerging_same_triple_keeps_members_intact():
+    engine = UnifiedProfileEngine()
+    for _ in range(3):
+        engine.merge_identities("carol@example.com", "u-carol", "device-3")
+    expected = {"carol@example.com", "u-carol", "device-3"}
+    for identifier in expected:
+        assert engine.members(identifier) == expected
+    engine.merge_identities("carol@example.com", "u-carol-2", "device-3")
+    assert engine.members("u-carol") == expected | {"u-carol-2"}
+
+
+def test_email_lookups_ignore_case_and_whitespace():
+    engine = UnifiedProfileEngine()
+    engine.merge_identities("  Dave@Example.COM ", "u-dave", "device-4")
+    assert engine.same_identity("DAVE@example.com", "u-dave")
+    assert engine.same_identity(" dave@EXAMPLE.com", "device-4")
+    assert engine.members("Dave@Example.com") == {"dave@example.com", "u-dave", "device-4"}
+
+
+def test_user_ids_are_case_sensitive():
+    engine = UnifiedProfileEngine()
+    engine.merge_identities("erin@example.com", "U-Erin", "device-5")
+    engine.merge_identities("frank@example.com", "u-erin", "device-6")
+    assert not engine.same_identity("U-Erin", "u-erin")
+    assert engine.members("U-Erin") == {"erin@example.com", "U-Erin", "device-5"}
+    assert engine.members("u-erin") == {"frank@example.com", "u-erin", "device-6"}
+    assert engine.members("U-ERIN") == set()
+    assert not engine.same_identity("U-ERIN", "device-5")
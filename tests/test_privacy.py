@@ -0,0 +1,25 @@
+"""PrivacyCompliance pseudonyms."""
+
+import pytest
+
+from src.cdp_platform import PrivacyCompliance
+
+KEY = b"k" * 32
+
+
+def test_pseudonyms_normalize_emails_only():
+    privacy = PrivacyCompliance(pseudonym_key=KEY)
+    assert privacy.pseudonymize(" Alice@Example.COM ") == privacy.pseudonymize("alice@example.com")
+    assert privacy.pseudonymize("U1") != privacy.pseudonymize("u1")
+    assert privacy.pseudonymize("U1") == privacy.pseudonymize("U1")
+    assert len(privacy.pseudonymize("U1")) == 16
+
+
+def test_pseudonyms_depend_on_key():
+    first = PrivacyCompliance(pseudonym_key=KEY)
+    second = PrivacyCompliance(pseudonym_key=b"q" * 32)
+    assert first.pseudonymize("alice@example.com") != second.pseudonymize("alice@example.com")
+    with pytest.raises(RuntimeError):
+        PrivacyCompliance().pseudonymize("alice@example.com")
+    with pytest.raises(ValueError):
+        PrivacyCompliance(pseudonym_key=b"short")
@@ -0,0 +1,128 @@
+"""The batch and fused-kernel segmentation paths must agree with segment_customer."""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src import _kernels
+from src.cdp_platform import (
+    Customer,
+    CustomerSegment,
+    IntelligentCDP,
+    PredictiveAnalytics,
+    RealtimeSegmentation,
+    SegmentRule,
+    _KERNEL_BITS,
+)
+
+NOW = datetime(2026, 1, 15, 12, 0, 0)
+
+
+def _boundary_customers():
+    offsets = [None]
+    for days in (0, 6, 7, 8, 29, 30, 31, 89, 90, 91):
+        for seconds in (-1, 0, 1):
+            offsets.append(timedelta(days=days, seconds=seconds))
+    customers = []
+    for i, offset in enumerate(offsets):
+        created = NOW - timedelta(days=(29, 30, 31)[i % 3], seconds=(-1, 0, 1)[i % 3])
+        customers.append(Customer(
+            id=f"c{i}",
+            email=f"c{i}@example.com",
+            name=f"C{i}",
+            lifetime_value=(9999.99, 10000, 10000.01)[i % 3],
+            last_activity=None if offset is None else NOW - offset,
+            created_at=created
+        ))
+    return customers
+
+
+def _reference(customers, segmentation=None):
+    segmentation = segmentation or RealtimeSegmentation()
+    predictive = PredictiveAnalytics()
+    masks, churn = [], []
+    for c in customers:
+        segmentation.segment_customer(c, NOW)
+        masks.append(c.segments)
+        churn.append(predictive.predict_churn(c, NOW))
+    return masks, churn
+
+
+def _kernel_inputs(customers):
+    n = len(customers)
+    la = np.array([c.last_activity or np.datetime64('NaT') for c in customers], dtype='datetime64[us]')
+    ca = np.array([c.created_at for c in customers], dtype='datetime64[us]')
+    return (
+        np.array([c.lifetime_value for c in customers], dtype=np.float64),
+        la.view(np.int64), ~np.isnat(la), ca.view(np.int64),
+        np.zeros(n, dtype=np.int64),
+        np.datetime64(NOW, 'us').astype(np.int64),
+        RealtimeSegmentation().kernel_thresholds, _KERNEL_BITS,
+        np.empty(n), np.empty(n), np.empty(n, dtype=np.uint8)
+    )
+
+
+def test_segment_batch_matches_segment_customer():
+    customers = _boundary_customers()
+    expected, _ = _reference(customers)
+    mask = RealtimeSegmentation().segment_batch(customers, NOW)
+    assert mask.tolist() == expected
+    assert [c.segments for c in customers] == expected
+
+
+@pytest.mark.parametrize("impl", ["numpy", "numba"])
+def test_score_all_matches_segment_customer(impl):
+    if impl == "numba":
+        pytest.importorskip("numba")
+        kernel = _kernels._load_numba()
+    else:
+        kernel = _kernels._score_all_numpy
+    customers = _boundary_customers()
+    expected_masks, expected_churn = _reference(customers)
+    args = _kernel_inputs(customers)
+    kernel(*args)
+    out_churn, _, out_mask = args[-3:]
+    assert out_mask.tolist() == expected_masks
+    assert out_churn.tolist() == pytest.approx(expected_churn)
+
+
+def test_score_batch_matches_segment_customer():
+    customers = _boundary_customers()
+    expected, _ = _reference(customers)
+    cdp = IntelligentCDP()
+    assert cdp.score_batch(customers, NOW).tolist() == expected
+
+
+@pytest.mark.parametrize("rule", [
+    SegmentRule('days_inactive', '>', 14),
+    SegmentRule('days_inactive', '>', np.float64(14)),
+    SegmentRule('days_inactive', '>', np.int64(14)),
+    SegmentRule('days_inactive', '>=', 30),
+    SegmentRule('lifetime_value', '<', 10000),
+])
+def test_batch_paths_respect_custom_rules(rule):
+    customers = _boundary_customers()
+    reference = RealtimeSegmentation()
+    reference.define_rule(CustomerSegment.AT_RISK, rule)
+    expected, _ = _reference(customers, reference)
+    
+    segmentation = RealtimeSegmentation()
+    segmentation.define_rule(CustomerSegment.AT_RISK, rule)
+    assert segmentation.segment_batch(customers, NOW).tolist() == expected
+    
+    cdp = IntelligentCDP()
+    cdp.segmentation.define_rule(CustomerSegment.AT_RISK, rule)
+    assert cdp.score_batch(customers, NOW).tolist() == expected
+
+
+def test_rules_reject_code_and_direct_mutation():
+    segmentation = RealtimeSegmentation()
+    with pytest.raises(TypeError):
+        segmentation.define_rule(CustomerSegment.NEW, lambda c, now: True)
+    with pytest.raises(TypeError):
+        segmentation.rules[CustomerSegment.NEW] = SegmentRule('days_since_created', '<', 7)
+    with pytest.raises(ValueError):
+        SegmentRule('__import__("os")', '>', 1)
+    with pytest.raises(ValueError):
+        SegmentRule('lifetime_value', '>', '1 or True')
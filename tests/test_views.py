@@ -0,0 +1,38 @@
+"""get_360_view_bytes must produce the same JSON with and without orjson."""
+
+from datetime import datetime
+
+import pytest
+
+import src.cdp_platform as cdp_platform
+from src.cdp_platform import Customer, UnifiedProfileEngine
+
+
+@pytest.fixture
+def engine():
+    engine = UnifiedProfileEngine()
+    engine.create_profile(Customer(
+        id="c1",
+        email="zoë@example.com",
+        name="Zoë Ünal",
+        attributes={1: 'x', 'tier': 'gold'},
+        lifetime_value=1000,
+        last_activity=datetime(2026, 1, 15, 12, 0, 0, 123456)
+    ))
+    return engine
+
+
+def test_view_bytes_match_across_backends(engine, monkeypatch):
+    pytest.importorskip("orjson")
+    with_orjson = engine.get_360_view_bytes("c1")
+    monkeypatch.setattr(cdp_platform, "orjson", None)
+    fallback = engine.get_360_view_bytes("c1")
+    assert with_orjson == fallback
+    assert "Zoë Ünal".encode() in fallback
+    assert b'"1":"x"' in fallback
+
+
+def test_view_bytes_fallback_without_orjson(engine, monkeypatch):
+    monkeypatch.setattr(cdp_platform, "orjson", None)
+    assert engine.get_360_view_bytes("missing") == b'{}'
+    assert b'"last_activity":"2026-01-15T12:00:00.123456"' in engine.get_360_view_bytes("c1")